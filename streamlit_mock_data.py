@@ -1,14 +1,26 @@
+import html
+import textwrap
+
 import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.express as px
+import plotly.graph_objects as go
 from datetime import datetime, timedelta
 
 
+def _comment_html(text):
+    """Escapes comment text and keeps its line breaks as <br> tags."""
+    return html.escape(text).replace("\n", "<br>")
+
+
+@st.fragment
 def add_comment_section():
     """
     Adds a comment section to the dashboard where users can leave feedback or notes,
     and simulates receiving email replies.
+
+    Runs as a fragment, so comment interactions only rerun this section.
     """
     st.markdown("---")
     st.subheader("Comments & Notes")
@@ -40,23 +52,33 @@ def add_comment_section():
 
         # Show existing dashboard comments
         if st.session_state.comments:
+            # Keep each comment's index into st.session_state.comments for deletion
+            dashboard_indices = [
+                j for j, c in enumerate(st.session_state.comments) if c.get('source') != 'email']
             dashboard_comments = [
-                c for c in st.session_state.comments if c.get('source') != 'email']
+                st.session_state.comments[j] for j in dashboard_indices]
 
             if dashboard_comments:
                 st.markdown("### Dashboard Comments")
-                for i, comment in enumerate(dashboard_comments):
-                    st.markdown(f"""
-                    <div style="padding: 10px; border-radius: 5px; border: 1px solid #ddd; margin-bottom: 10px;">
-                        <small>{comment['timestamp']}</small>
-                        <p>{comment['text']}</p>
-                    </div>
-                    """, unsafe_allow_html=True)
-
-                    # Allow comment deletion
-                    if st.button(f"Delete", key=f"delete_dash_{i}"):
-                        st.session_state.comments.remove(comment)
-                        st.experimental_rerun()
+                # Render all comments in a single markdown block
+                st.markdown("\n".join(textwrap.dedent(f"""
+                <div style="padding: 10px; border-radius: 5px; border: 1px solid #ddd; margin-bottom: 10px;">
+                    <small>{html.escape(comment['timestamp'])}</small>
+                    <p>{_comment_html(comment['text'])}</p>
+                </div>
+                """) for comment in dashboard_comments), unsafe_allow_html=True)
+
+                # Allow comment deletion
+                with st.form("delete_dash_form", clear_on_submit=True):
+                    to_delete = st.multiselect(
+                        "Select comments to delete:",
+                        options=dashboard_indices,
+                        format_func=lambda j: f"{st.session_state.comments[j]['timestamp']} - {st.session_state.comments[j]['text'][:40]}")
+                    if st.form_submit_button("Delete") and to_delete:
+                        # Delete from the back so earlier indices stay valid
+                        for j in sorted(to_delete, reverse=True):
+                            del st.session_state.comments[j]
+                        st.rerun(scope="fragment")
             else:
                 st.info("No dashboard comments yet. Add a comment above.")
 
@@ -93,24 +115,34 @@ def add_comment_section():
 
         # Show existing email comments
         if st.session_state.comments:
+            # Keep each reply's index into st.session_state.comments for deletion
+            email_indices = [
+                j for j, c in enumerate(st.session_state.comments) if c.get('source') == 'email']
             email_comments = [
-                c for c in st.session_state.comments if c.get('source') == 'email']
+                st.session_state.comments[j] for j in email_indices]
 
             if email_comments:
                 st.markdown("### Email Replies")
-                for i, comment in enumerate(email_comments):
-                    st.markdown(f"""
-                    <div style="padding: 10px; border-radius: 5px; border: 1px solid #4285F4; background-color: #E8F0FE; margin-bottom: 10px;">
-                        <small>📧 Email reply from {comment['sender']} - {comment['timestamp']}</small>
-                        <small>Subject: {comment['subject']}</small>
-                        <p style="margin-top: 5px; margin-bottom: 0;">{comment['text']}</p>
-                    </div>
-                    """, unsafe_allow_html=True)
-
-                    # Allow email reply deletion
-                    if st.button(f"Delete", key=f"delete_email_{i}"):
-                        st.session_state.comments.remove(comment)
-                        st.experimental_rerun()
+                # Render all email replies in a single markdown block
+                st.markdown("\n".join(textwrap.dedent(f"""
+                <div style="padding: 10px; border-radius: 5px; border: 1px solid #4285F4; background-color: #E8F0FE; margin-bottom: 10px;">
+                    <small>📧 Email reply from {html.escape(comment['sender'])} - {html.escape(comment['timestamp'])}</small>
+                    <small>Subject: {html.escape(comment['subject'])}</small>
+                    <p style="margin-top: 5px; margin-bottom: 0;">{_comment_html(comment['text'])}</p>
+                </div>
+                """) for comment in email_comments), unsafe_allow_html=True)
+
+                # Allow email reply deletion
+                with st.form("delete_email_form", clear_on_submit=True):
+                    to_delete = st.multiselect(
+                        "Select email replies to delete:",
+                        options=email_indices,
+                        format_func=lambda j: f"{st.session_state.comments[j]['timestamp']} - {st.session_state.comments[j]['sender']}")
+                    if st.form_submit_button("Delete") and to_delete:
+                        # Delete from the back so earlier indices stay valid
+                        for j in sorted(to_delete, reverse=True):
+                            del st.session_state.comments[j]
+                        st.rerun(scope="fragment")
             else:
                 st.info("No email replies yet. Simulate one above.")
 
@@ -120,27 +152,31 @@ def add_comment_section():
     if show_all and st.session_state.comments:
         st.markdown("### All Comments")
 
-        # Sort all comments by timestamp
-        all_comments = sorted(st.session_state.comments,
-                              key=lambda x: x['timestamp'], reverse=True)
+        # Comments are appended in time order, so newest first is just reversed
+        all_comments = reversed(st.session_state.comments)
 
-        for i, comment in enumerate(all_comments):
+        comment_blocks = []
+        for comment in all_comments:
             # Special formatting for email-sourced comments
             if comment.get('source') == 'email':
-                st.markdown(f"""
+                comment_blocks.append(textwrap.dedent(f"""
                 <div style="padding: 10px; border-radius: 5px; border: 1px solid #4285F4; background-color: #E8F0FE; margin-bottom: 10px;">
-                    <small>📧 Email reply from {comment['sender']} - {comment['timestamp']}</small>
-                    <p style="margin-top: 5px; margin-bottom: 0;">{comment['text']}</p>
+                    <small>📧 Email reply from {html.escape(comment['sender'])} - {html.escape(comment['timestamp'])}</small>
+                    <p style="margin-top: 5px; margin-bottom: 0;">{_comment_html(comment['text'])}</p>
                 </div>
-                """, unsafe_allow_html=True)
+                """))
             else:
                 # Regular comment display
-                st.markdown(f"""
+                comment_blocks.append(textwrap.dedent(f"""
                 <div style="padding: 10px; border-radius: 5px; border: 1px solid #ddd; margin-bottom: 10px;">
-                    <small>💬 Dashboard comment - {comment['timestamp']}</small>
-                    <p>{comment['text']}</p>
+                    <small>💬 Dashboard comment - {html.escape(comment['timestamp'])}</small>
+                    <p>{_comment_html(comment['text'])}</p>
                 </div>
-                """, unsafe_allow_html=True)
+                """))
+
+        # Render all comments in a single markdown block, each block is
+        # dedented on its own so one comment cannot shift the others
+        st.markdown("\n".join(comment_blocks), unsafe_allow_html=True)
 
 
 def add_segment_performance_view(filtered_sales):
@@ -161,17 +197,9 @@ def add_segment_performance_view(filtered_sales):
     end_date = current_date
     start_date = end_date - timedelta(days=90)  # Default to last 90 days
 
-    # Prepare data
-    # Add week and month fields
-    filtered_sales['Week'] = filtered_sales['Date'].dt.isocalendar().week
-    filtered_sales['Year_Week'] = filtered_sales['Date'].dt.year.astype(
-        str) + "-W" + filtered_sales['Week'].astype(str).str.zfill(2)
-    filtered_sales['Year_Month'] = filtered_sales['Date'].dt.year.astype(
-        str) + "-" + filtered_sales['Date'].dt.month.astype(str).str.zfill(2)
-
-    # Get unique weeks and months
-    weeks = sorted(filtered_sales['Year_Week'].unique())
-    months = sorted(filtered_sales['Year_Month'].unique())
+    # Get unique weeks and months from the precomputed period keys
+    weeks = sorted(filtered_sales['_ywk'].unique())
+    months = sorted(filtered_sales['_ymo'].unique())
 
     # Only proceed if we have enough data
     if len(weeks) >= 2 and len(months) >= 2:
@@ -179,55 +207,53 @@ def add_segment_performance_view(filtered_sales):
         current_week, previous_week = weeks[-1], weeks[-2]
         current_month, previous_month = months[-1], months[-2]
 
-        # Group by segment and time period
-        segment_current_week = filtered_sales[filtered_sales['Year_Week'] == current_week].groupby(
-            segment_type)['Revenue'].sum()
-        segment_previous_week = filtered_sales[filtered_sales['Year_Week'] == previous_week].groupby(segment_type)[
-            'Revenue'].sum()
+        # Group by segment and time period, one pass per granularity
+        weekly_revenue = filtered_sales[filtered_sales['_ywk'].isin([current_week, previous_week])].groupby(
+            [segment_type, '_ywk'], sort=False, observed=True)['Revenue'].sum().unstack('_ywk', fill_value=0)
+        monthly_revenue = filtered_sales[filtered_sales['_ymo'].isin([current_month, previous_month])].groupby(
+            [segment_type, '_ymo'], sort=False, observed=True)['Revenue'].sum().unstack('_ymo', fill_value=0)
 
-        segment_current_month = filtered_sales[filtered_sales['Year_Month'] == current_month].groupby(segment_type)[
-            'Revenue'].sum()
-        segment_previous_month = filtered_sales[filtered_sales['Year_Month'] == previous_month].groupby(segment_type)[
-            'Revenue'].sum()
+        # Align every segment present in the filtered data, missing periods count as 0
+        segments = filtered_sales[segment_type].unique()
+        weekly_revenue = weekly_revenue.reindex(segments, fill_value=0)
+        monthly_revenue = monthly_revenue.reindex(segments, fill_value=0)
 
-        # Create performance dataframe
-        performance_data = []
-
-        for segment in filtered_sales[segment_type].unique():
-            # Calculate WoW and MoM changes
-            wow_value = segment_current_week.get(segment, 0)
-            prev_wow_value = segment_previous_week.get(segment, 0)
-            wow_change = ((wow_value - prev_wow_value) /
-                          prev_wow_value * 100) if prev_wow_value > 0 else 0
-
-            mom_value = segment_current_month.get(segment, 0)
-            prev_mom_value = segment_previous_month.get(segment, 0)
-            mom_change = ((mom_value - prev_mom_value) /
-                          prev_mom_value * 100) if prev_mom_value > 0 else 0
-
-            performance_data.append({
-                'Segment': segment,
-                'Current Revenue': wow_value,
-                'WoW Change (%)': wow_change,
-                'MoM Change (%)': mom_change
-            })
+        segment_current_week = weekly_revenue[current_week]
+        segment_previous_week = weekly_revenue[previous_week]
+
+        segment_current_month = monthly_revenue[current_month]
+        segment_previous_month = monthly_revenue[previous_month]
 
-        performance_df = pd.DataFrame(performance_data)
+        # Calculate WoW and MoM changes, 0 where there is no previous revenue
+        wow_change = ((segment_current_week - segment_previous_week) /
+                      segment_previous_week.where(segment_previous_week > 0) * 100).fillna(0)
+        mom_change = ((segment_current_month - segment_previous_month) /
+                      segment_previous_month.where(segment_previous_month > 0) * 100).fillna(0)
+
+        # Create performance dataframe
+        performance_df = pd.DataFrame({
+            'Segment': segments,
+            'Current Revenue': segment_current_week.to_numpy(),
+            'WoW Change (%)': wow_change.to_numpy(),
+            'MoM Change (%)': mom_change.to_numpy()
+        })
 
         # Display the performance table with color coding
         st.write(f"### {segment_type} Performance")
         st.write(
-            f"Current Week: {current_week} | Current Month: {current_month}")
+            f"Current Week: {current_week // 100}-W{current_week % 100:02d} | "
+            f"Current Month: {current_month // 100}-{current_month % 100:02d}")
 
-        # Format the dataframe
-        def color_change(val):
-            color = 'green' if val > 0 else 'red' if val < 0 else 'black'
-            return f'color: {color}; font-weight: bold'
+        # Format the dataframe, coloring a whole column of changes at once
+        def color_change(col):
+            return np.where(col > 0, 'color: green; font-weight: bold',
+                            np.where(col < 0, 'color: red; font-weight: bold',
+                                     'color: black; font-weight: bold'))
 
         # Apply styling
         styled_df = performance_df.style.\
             format({'Current Revenue': '${:,.2f}', 'WoW Change (%)': '{:+.2f}%', 'MoM Change (%)': '{:+.2f}%'}).\
-            applymap(color_change, subset=['WoW Change (%)', 'MoM Change (%)'])
+            apply(color_change, subset=['WoW Change (%)', 'MoM Change (%)'])
 
         st.dataframe(styled_df, use_container_width=True)
 
@@ -249,21 +275,65 @@ def add_segment_performance_view(filtered_sales):
         st.plotly_chart(fig, use_container_width=True)
 
         # Add insight
-        best_segment = performance_df.loc[performance_df['MoM Change (%)'].idxmax(
-        )]['Segment']
-        worst_segment = performance_df.loc[performance_df['MoM Change (%)'].idxmin(
-        )]['Segment']
+        mom_stats = performance_df['MoM Change (%)'].agg(['idxmax', 'idxmin'])
+        best_row = performance_df.loc[mom_stats['idxmax']]
+        worst_row = performance_df.loc[mom_stats['idxmin']]
 
         st.info(f"""
         **Quick Insights:**
-        - Best performing {segment_type.lower()}: **{best_segment}** (MoM: {performance_df.loc[performance_df['MoM Change (%)'].idxmax()]['MoM Change (%)']:.1f}%)
-        - Needs attention: **{worst_segment}** (MoM: {performance_df.loc[performance_df['MoM Change (%)'].idxmin()]['MoM Change (%)']:.1f}%)
+        - Best performing {segment_type.lower()}: **{best_row['Segment']}** (MoM: {best_row['MoM Change (%)']:.1f}%)
+        - Needs attention: **{worst_row['Segment']}** (MoM: {worst_row['MoM Change (%)']:.1f}%)
         """)
     else:
         st.warning(
             "Not enough data to calculate week-over-week or month-over-month changes. Need at least 2 months of data.")
 
 
+@st.cache_data
+def _csv_bytes(data):
+    """Serializes the dataframe to UTF-8 encoded CSV bytes."""
+    return data.to_csv(index=False).encode('utf-8')
+
+
+@st.cache_data
+def _excel_bytes(data):
+    """Serializes the dataframe to an Excel workbook with a formatted header row."""
+    import io
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Border, Font, PatternFill, Side
+    from openpyxl.utils import get_column_letter
+
+    # Write-only mode streams rows out instead of building the full cell model
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet('Data')
+
+    # Header cell format
+    side = Side(style='thin')
+    header_font = Font(bold=True)
+    header_fill = PatternFill(fill_type='solid', fgColor='D3D3D3')
+    header_border = Border(left=side, right=side, top=side, bottom=side)
+
+    header = []
+    for col_num, value in enumerate(data.columns.values, start=1):
+        cell = WriteOnlyCell(worksheet, value=str(value))
+        cell.font = header_font
+        cell.fill = header_fill
+        cell.border = header_border
+        header.append(cell)
+        # Set column width based on content
+        worksheet.column_dimensions[get_column_letter(col_num)].width = max(
+            len(str(value)), 10)
+
+    worksheet.append(header)
+    for row in data.itertuples(index=False, name=None):
+        worksheet.append(row)
+
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
 def add_export_options(data, prefix="data"):
     """
     Adds export options (CSV/Excel) for the provided dataframe.
@@ -275,8 +345,6 @@ def add_export_options(data, prefix="data"):
     prefix : str
         Prefix for the exported filename
     """
-    import io
-
     st.subheader("Export Options")
 
     # Options for export
@@ -294,8 +362,8 @@ def add_export_options(data, prefix="data"):
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 
     if export_type == "CSV":
-        # Convert to CSV
-        csv = data.to_csv(index=False).encode('utf-8')
+        # Convert to CSV (cached while the data is unchanged)
+        csv = _csv_bytes(data)
 
         # Download button
         st.download_button(
@@ -306,30 +374,8 @@ def add_export_options(data, prefix="data"):
         )
     else:  # Excel
         try:
-            # Convert to Excel
-            buffer = io.BytesIO()
-            with pd.ExcelWriter(buffer, engine='xlsxwriter') as writer:
-                data.to_excel(writer, index=False, sheet_name='Data')
-
-                # Access the XlsxWriter workbook and worksheet objects
-                workbook = writer.book
-                worksheet = writer.sheets['Data']
-
-                # Add some cell formats
-                header_format = workbook.add_format({
-                    'bold': True,
-                    'bg_color': '#D3D3D3',
-                    'border': 1
-                })
-
-                # Write the column headers with the defined format
-                for col_num, value in enumerate(data.columns.values):
-                    worksheet.write(0, col_num, value, header_format)
-                    # Set column width based on content
-                    worksheet.set_column(
-                        col_num, col_num, max(len(str(value)), 10))
-
-            excel_data = buffer.getvalue()
+            # Convert to Excel (cached while the data is unchanged)
+            excel_data = _excel_bytes(data)
 
             # Download button
             st.download_button(
@@ -341,7 +387,7 @@ def add_export_options(data, prefix="data"):
         except Exception as e:
             st.error(f"Excel export failed: {e}")
             st.info(
-                "Please make sure xlsxwriter is installed: pip install xlsxwriter")
+                "Please make sure openpyxl is installed: pip install openpyxl")
 
 
 def simulate_email_reply():
@@ -454,32 +500,139 @@ def add_email_dashboard():
             })
 
 
+@st.cache_data(ttl=None)
 def generate_mock_data():
     np.random.seed(42)
     dates = pd.date_range(start=datetime.now() -
                           timedelta(days=365), end=datetime.now(), freq='D')
     products = ["Enterprise", "Professional", "Starter"]
+    prices = np.array([1000, 200, 50])  # Unit price, aligned with products
     regions = ["North America", "Europe", "Asia Pacific", "Latin America"]
 
-    data = []
-    for date in dates:
-        for product in products:
-            for region in regions:
-                if np.random.random() > 0.7:  # Not every day has data
-                    price = 1000 if product == "Enterprise" else 200 if product == "Professional" else 50
-                    quantity = np.random.randint(1, 20)
-                    revenue = price * quantity
-                    cost = revenue * 0.4
-                    data.append({
-                        "Date": date,
-                        "Product": product,
-                        "Region": region,
-                        "Revenue": revenue,
-                        "Cost": cost,
-                        "Profit": revenue - cost
-                    })
+    # Build the date x product x region grid as flat column arrays
+    n_dates = len(dates)
+    n = n_dates * len(products) * len(regions)
+    date_col = np.repeat(dates.values, len(products) * len(regions))
+    product_col = pd.Categorical(
+        np.tile(np.repeat(products, len(regions)), n_dates), categories=products)
+    region_col = np.tile(regions, n_dates * len(products))
+
+    mask = np.random.random(n) > 0.7  # Not every day has data
+    quantity = np.random.randint(1, 20, n)
+    price = prices[product_col.codes]  # Gather by category code, no string compares
+    revenue = price * quantity
+    cost = revenue * 0.4
+
+    df = pd.DataFrame({
+        "Date": date_col[mask],
+        "Product": product_col[mask],
+        "Region": region_col[mask],
+        "Revenue": revenue[mask],
+        "Cost": cost[mask],
+        "Profit": (revenue - cost)[mask]
+    })
+
+    # Low-cardinality string columns are stored as categories
+    df["Region"] = df["Region"].astype("category")
+
+    # Amounts are whole numbers well below 2**24, so float32 stores them exactly
+    df["Revenue"] = df["Revenue"].astype("float32")
+    df["Cost"] = df["Cost"].astype("float32")
+    df["Profit"] = df["Profit"].astype("float32")
+
+    # Precompute period keys once per cache lifetime instead of on every rerun,
+    # weeks and months as integer keys (e.g. 202407 for 2024-W07)
+    iso_calendar = df["Date"].dt.isocalendar()
+    df["_ywk"] = iso_calendar.year.astype(
+        "int32") * 100 + iso_calendar.week.astype("int32")
+    df["_ymo"] = df["Date"].dt.year.astype(
+        "int32") * 100 + df["Date"].dt.month.astype("int32")
+    df["_date"] = df["Date"].dt.normalize()
+
+    return df
+
+
+@st.cache_data(max_entries=32)
+def compute_filtered(_sales_df, start_date, end_date, regions, products):
+    """
+    Filters the sales data by the sidebar selections and computes the key metrics.
 
-    return pd.DataFrame(data)
+    Parameters:
+    -----------
+    _sales_df : pandas.DataFrame
+        The full sales dataframe, left out of the cache key since it is
+        immutable behind generate_mock_data's cache
+    start_date, end_date : datetime.date or None
+        Inclusive date range, or None to keep all dates
+    regions, products : tuple
+        Selected regions and products, an empty tuple keeps all of them
+
+    Returns:
+    --------
+    tuple
+        (filtered_sales, total_revenue, total_profit, profit_margin)
+    """
+    filtered_sales = _sales_df
+
+    if start_date is not None and end_date is not None:
+        # Compare raw datetime64 values against [start, end + 1 day)
+        start_ts = pd.Timestamp(start_date).to_datetime64()
+        end_ts = (pd.Timestamp(end_date) +
+                  pd.Timedelta(days=1)).to_datetime64()
+        date_values = filtered_sales["Date"].values
+        filtered_sales = filtered_sales[(
+            date_values >= start_ts) & (date_values < end_ts)]
+
+    if regions:
+        filtered_sales = filtered_sales[filtered_sales["Region"].isin(regions)]
+    if products:
+        filtered_sales = filtered_sales[filtered_sales["Product"].isin(
+            products)]
+
+    total_revenue = filtered_sales["Revenue"].sum()
+    total_profit = filtered_sales["Profit"].sum()
+    profit_margin = (total_profit / total_revenue *
+                     100) if total_revenue > 0 else 0
+
+    return filtered_sales, total_revenue, total_profit, profit_margin
+
+
+# The leading underscore keeps Streamlit from hashing the frame: sales_df is
+# immutable behind generate_mock_data's cache, so a single entry is enough
+@st.cache_data
+def _date_range(_sales_df):
+    """Returns the first and last date in the sales data."""
+    return _sales_df["Date"].min().date(), _sales_df["Date"].max().date()
+
+
+@st.cache_data
+def _filter_options(_sales_df):
+    """Returns the unique regions and products offered by the sidebar filters."""
+    return _sales_df["Region"].unique().tolist(), _sales_df["Product"].unique().tolist()
+
+
+# Chart inputs must hash by value: numeric/datetime64 arrays or tuples of str
+@st.cache_resource(max_entries=32)
+def _line_fig(x, y, title, x_title, y_title, markers=False):
+    """Builds a line chart from plain arrays, reused while the data is unchanged."""
+    return go.Figure(
+        go.Scatter(x=x, y=y, mode="lines+markers" if markers else "lines"),
+        layout={"title": title, "xaxis_title": x_title, "yaxis_title": y_title})
+
+
+@st.cache_resource(max_entries=32)
+def _pie_fig(labels, values, title):
+    """Builds a pie chart from plain arrays, reused while the data is unchanged."""
+    return go.Figure(go.Pie(labels=labels, values=values), layout={"title": title})
+
+
+@st.cache_resource(max_entries=32)
+def _bar_fig(x, y, title, x_title, y_title):
+    """Builds a bar chart with one colored trace per category, reused while the data is unchanged."""
+    return go.Figure(
+        [go.Bar(x=[label], y=[value], name=str(label)) for label, value in zip(x, y)],
+        layout={"title": title, "xaxis_title": x_title, "yaxis_title": y_title,
+                "legend_title": x_title, "barmode": "relative"})
 
 
 # Generate data
@@ -489,35 +642,25 @@ sales_df = generate_mock_data()
 st.title("SaaS Sales Dashboard")
 
 # Date filter
-min_date, max_date = sales_df["Date"].min(
-).date(), sales_df["Date"].max().date()
+min_date, max_date = _date_range(sales_df)
 date_range = st.sidebar.date_input(
     "Select Date Range", [min_date, max_date], min_date, max_date)
 
-# Filter data
-if len(date_range) == 2:
-    start_date, end_date = date_range
-    filtered_sales = sales_df[(sales_df["Date"].dt.date >= start_date) & (
-        sales_df["Date"].dt.date <= end_date)]
-else:
-    filtered_sales = sales_df
-
 # Filters for region and product
+region_options, product_options = _filter_options(sales_df)
 regions = st.sidebar.multiselect(
-    "Select Regions", options=sales_df["Region"].unique(), default=sales_df["Region"].unique())
+    "Select Regions", options=region_options, default=region_options)
 products = st.sidebar.multiselect(
-    "Select Products", options=sales_df["Product"].unique(), default=sales_df["Product"].unique())
+    "Select Products", options=product_options, default=product_options)
 
-if regions:
-    filtered_sales = filtered_sales[filtered_sales["Region"].isin(regions)]
-if products:
-    filtered_sales = filtered_sales[filtered_sales["Product"].isin(products)]
+# Filter data and compute key metrics
+if len(date_range) == 2:
+    start_date, end_date = date_range
+else:
+    start_date, end_date = None, None
 
-# Key Metrics
-total_revenue = filtered_sales["Revenue"].sum()
-total_profit = filtered_sales["Profit"].sum()
-profit_margin = (total_profit / total_revenue *
-                 100) if total_revenue > 0 else 0
+filtered_sales, total_revenue, total_profit, profit_margin = compute_filtered(
+    sales_df, start_date, end_date, tuple(sorted(regions)), tuple(sorted(products)))
 
 col1, col2, col3 = st.columns(3)
 with col1:
@@ -527,30 +670,34 @@ with col2:
 with col3:
     st.metric("Profit Margin", f"{profit_margin:.2f}%")
 
+# Revenue by product and region, shared by the Overview and Executive tabs
+product_rev = filtered_sales.groupby(
+    "Product", sort=False, observed=True)["Revenue"].sum()
+region_rev = filtered_sales.groupby(
+    "Region", sort=False, observed=True)["Revenue"].sum()
+
 # Create tabs for different views
 tab1, tab2, tab3 = st.tabs(["Overview", "Detailed Analysis", "Executive View"])
 
 with tab1:
     # Revenue over time
-    revenue_by_date = filtered_sales.groupby(filtered_sales["Date"].dt.date)[
-        "Revenue"].sum().reset_index()
-    fig1 = px.line(revenue_by_date, x="Date",
-                   y="Revenue", title="Daily Revenue")
+    revenue_by_date = filtered_sales.groupby("_date", sort=False)[
+        "Revenue"].sum().rename_axis("Date").reset_index()
+    fig1 = _line_fig(revenue_by_date["Date"].to_numpy(), revenue_by_date["Revenue"].to_numpy(),
+                     "Daily Revenue", "Date", "Revenue")
     st.plotly_chart(fig1, use_container_width=True)
 
     # Revenue by product and region
     col1, col2 = st.columns(2)
     with col1:
-        product_revenue = filtered_sales.groupby(
-            "Product")["Revenue"].sum().reset_index()
-        fig2 = px.pie(product_revenue, values="Revenue",
-                      names="Product", title="Revenue by Product")
+        product_revenue = product_rev.reset_index()
+        fig2 = _pie_fig(tuple(product_revenue["Product"].astype(str)), product_revenue["Revenue"].to_numpy(),
+                        "Revenue by Product")
         st.plotly_chart(fig2, use_container_width=True)
     with col2:
-        region_revenue = filtered_sales.groupby(
-            "Region")["Revenue"].sum().reset_index()
-        fig3 = px.bar(region_revenue, x="Region", y="Revenue",
-                      title="Revenue by Region", color="Region")
+        region_revenue = region_rev.reset_index()
+        fig3 = _bar_fig(tuple(region_revenue["Region"].astype(str)), region_revenue["Revenue"].to_numpy(),
+                        "Revenue by Region", "Region", "Revenue")
         st.plotly_chart(fig3, use_container_width=True)
 
 with tab2:
@@ -559,27 +706,34 @@ with tab2:
                                "Daily", "Weekly", "Monthly"])
 
     if granularity == "Daily":
-        granular_data = filtered_sales.groupby(filtered_sales["Date"].dt.date)[
-            "Revenue"].sum().reset_index()
+        granular_data = filtered_sales.groupby("_date", sort=False)[
+            "Revenue"].sum().rename_axis("Date").reset_index()
         x_col = "Date"
     elif granularity == "Weekly":
-        filtered_sales["Week"] = filtered_sales["Date"].dt.strftime('%Y-W%U')
         granular_data = filtered_sales.groupby(
-            "Week")["Revenue"].sum().reset_index()
+            "_ywk", sort=False)["Revenue"].sum().reset_index()
+        # Label the aggregated periods only, not every row
+        granular_data["Week"] = (granular_data["_ywk"] // 100).astype(str) + \
+            "-W" + (granular_data["_ywk"] % 100).astype(str).str.zfill(2)
         x_col = "Week"
     else:  # Monthly
-        filtered_sales["Month"] = filtered_sales["Date"].dt.strftime('%Y-%m')
         granular_data = filtered_sales.groupby(
-            "Month")["Revenue"].sum().reset_index()
+            "_ymo", sort=False)["Revenue"].sum().reset_index()
+        granular_data["Month"] = (granular_data["_ymo"] // 100).astype(str) + \
+            "-" + (granular_data["_ymo"] % 100).astype(str).str.zfill(2)
         x_col = "Month"
 
-    fig4 = px.line(granular_data, x=x_col, y="Revenue",
-                   title=f"{granularity} Revenue", markers=True)
+    # Dates are datetime64, week/month labels are passed as a tuple of str
+    x_values = granular_data[x_col].to_numpy(
+    ) if x_col == "Date" else tuple(granular_data[x_col])
+    fig4 = _line_fig(x_values, granular_data["Revenue"].to_numpy(),
+                     f"{granularity} Revenue", x_col, "Revenue", markers=True)
     st.plotly_chart(fig4, use_container_width=True)
 
     # Data table
     st.subheader("Detailed Data")
-    st.dataframe(filtered_sales.sort_values("Date", ascending=False).head(100))
+    st.dataframe(filtered_sales.sort_values("Date", ascending=False).head(
+        100).drop(columns=["_ywk", "_ymo", "_date"]))
     add_segment_performance_view(filtered_sales)
 
 
@@ -613,10 +767,8 @@ with tab3:
         """, unsafe_allow_html=True)
 
         # Top performers
-        top_product = filtered_sales.groupby("Product")["Revenue"].sum(
-        ).idxmax() if not filtered_sales.empty else "N/A"
-        top_region = filtered_sales.groupby("Region")["Revenue"].sum(
-        ).idxmax() if not filtered_sales.empty else "N/A"
+        top_product = product_rev.idxmax() if not filtered_sales.empty else "N/A"
+        top_region = region_rev.idxmax() if not filtered_sales.empty else "N/A"
 
         st.markdown(f"""
         ### Key Highlights